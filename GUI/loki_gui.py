@@ -6,18 +6,21 @@ Features streaming text output and clickable source documents.
 """
 
 import os
+import io
 import sys
 import json
+import pickle
+import codecs
+import contextlib
 import subprocess
 import threading
-import queue
 import time
 import platform
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 import tempfile
 import re
-import glob
 
 try:
     import tkinter as tk
@@ -32,15 +35,27 @@ except ImportError as e:
 ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue", "green", "dark-blue"
 
+# Keep temporary scripts and prompts on tmpfs when available (no disk writeback)
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# User home directory, resolved once
+HOME_DIR = os.path.expanduser("~")
+
+# LOKI installation directory (override with the LOKI_HOME environment variable)
+LOKI_DIR = os.environ.get("LOKI_HOME") or os.path.join(HOME_DIR, "LOKI")
+
 # Check if running from correct directory
-if not os.path.exists('/home/mike/LOKI'):
-    print("Error: LOKI directory not found at /home/mike/LOKI")
+if not os.path.exists(LOKI_DIR):
+    print(f"Error: LOKI directory not found at {LOKI_DIR}")
     print("Please run this script from the LOKI directory or check your installation.")
     sys.exit(1)
 
 
 class ScrolledTextWithPopupMenu(tk.Text):
     """A text widget with scrollbars and popup menu."""
+    # Keep at most this many lines; older ones are dropped in chunks
+    MAX_LINES = 2000
+    
     def __init__(self, master=None, **kwargs):
         tk.Text.__init__(self, master, **kwargs)
         
@@ -79,6 +94,17 @@ class ScrolledTextWithPopupMenu(tk.Text):
         self.mark_set(tk.INSERT, "1.0")
         self.see(tk.INSERT)
         return "break"  # Prevent default handling
+    
+    def trim_lines(self):
+        """Drop the oldest lines once the widget grows well past MAX_LINES (state must be NORMAL).
+        
+        Returns True if any lines were removed.
+        """
+        end_line = int(self.index("end-1c").split(".")[0])
+        if end_line > self.MAX_LINES + 200:
+            self.delete("1.0", f"{end_line - self.MAX_LINES}.0")
+            return True
+        return False
 
 
 class ChatText(ScrolledTextWithPopupMenu):
@@ -98,31 +124,65 @@ class ChatText(ScrolledTextWithPopupMenu):
         self.tag_bind("clickable", "<Enter>", lambda e: self.config(cursor="hand2"))
         self.tag_bind("clickable", "<Leave>", lambda e: self.config(cursor=""))
         
+        # One click handler for all source links; each link carries a "sid:<n>" tag
+        # that selects its callback
+        self.tag_bind("clickable", "<Button-1>", self._on_source_click)
+        self._source_callbacks = {}
+        self._next_source_id = 0
+        
         # Store source references
         self.sources = {}
+        
+        # Text waiting to be inserted; bursts of messages and streamed tokens are
+        # written together in a single insert
+        self._pending = deque()
+        self._flush_scheduled = False
     
-    def append_message(self, message, tag=None):
-        """Add a message to the chat display."""
+    def _queue_insert(self, text, tags=()):
+        """Queue text for the next batched insert."""
+        self._pending.append((text, tags or ()))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after(50, self._flush)
+    
+    def _flush(self):
+        """Insert all queued text at once and scroll to the end."""
+        self._flush_scheduled = False
+        items = []
+        while self._pending:
+            items.append(self._pending.popleft())
+        if not items:
+            return
+        
+        insert_args = []
+        for text, tags in items:
+            insert_args += [text, tags]
+        
         self.config(state=tk.NORMAL)
+        self.insert(tk.END, *insert_args)
+        if self.trim_lines():
+            # Forget links that were trimmed away
+            for source_id in [sid for sid in self._source_callbacks if not self.tag_ranges(sid)]:
+                del self._source_callbacks[source_id]
+                self.tag_delete(source_id)
         
+        # Scroll to the end
+        self.see(tk.END)
+        self.config(state=tk.DISABLED)
+    
+    def append_message(self, message, tag=None):
+        """Add a message to the chat display."""
         # Add timestamp for new messages
         if not message.startswith("\n"):
             timestamp = datetime.now().strftime("[%H:%M:%S] ")
-            self.insert(tk.END, timestamp, "system")
+            self._queue_insert(timestamp, "system")
         
         # Add the message with appropriate tag
-        self.insert(tk.END, message + "\n", tag)
-        
-        # Scroll to the end
-        self.see(tk.END)
-        self.config(state=tk.DISABLED)
+        self._queue_insert(message + "\n", tag)
     
     def append_streaming_text(self, text):
         """Append text to the chat display in a streaming fashion."""
-        self.config(state=tk.NORMAL)
-        self.insert(tk.END, text)
-        self.see(tk.END)
-        self.config(state=tk.DISABLED)
+        self._queue_insert(text)
     
     def add_source_reference(self, source_num, source_info):
         """Add a reference to a source."""
@@ -130,37 +190,43 @@ class ChatText(ScrolledTextWithPopupMenu):
     
     def add_clickable_source(self, source_num, category, filename, callback):
         """Add a clickable source link to the chat display."""
-        self.config(state=tk.NORMAL)
-        
-        # Create a unique tag for this source
-        source_tag = f"source_{source_num}"
+        # Give this link its own id so repeated source numbers keep their own callback
+        self._next_source_id += 1
+        source_id = f"sid:{self._next_source_id}"
+        self._source_callbacks[source_id] = callback
         
         # Insert the source text
         source_text = f"[Source {source_num}: {category}/{filename}]"
-        self.insert(tk.END, source_text, ("clickable", source_tag))
-        self.insert(tk.END, "\n")
-        
-        # Bind click event to the source tag
-        self.tag_bind(source_tag, "<Button-1>", callback)
-        
-        # Scroll to the end
-        self.see(tk.END)
-        self.config(state=tk.DISABLED)
+        self._queue_insert(source_text, ("clickable", source_id))
+        self._queue_insert("\n")
+    
+    def _on_source_click(self, event):
+        """Run the callback of the source link under the mouse."""
+        for tag in self.tag_names("current"):
+            callback = self._source_callbacks.get(tag)
+            if callback:
+                return callback(event)
     
     def clear(self):
         """Clear all text in the widget."""
+        self._pending.clear()
         self.config(state=tk.NORMAL)
         self.delete(1.0, tk.END)
         self.config(state=tk.DISABLED)
         # Clear source references
         self.sources.clear()
+        self._source_callbacks.clear()
 
 
 class LokiSettingsDialog(tk.Toplevel):
     """Dialog for LLM settings."""
     
+    # The dialog currently open, if any (only one is allowed at a time)
+    _instance = None
+    
     def __init__(self, parent, context_size=8192, temperature=0.7):
         super().__init__(parent)
+        LokiSettingsDialog._instance = self
         
         self.title("LOKI Settings")
         self.geometry("400x200")
@@ -170,6 +236,10 @@ class LokiSettingsDialog(tk.Toplevel):
         self.transient(parent)
         self.grab_set()
         
+        # Closing from the title bar must go through destroy() as well, or _instance
+        # would keep pointing at the dead window
+        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
+        
         # Set initial values
         self.context_size = tk.StringVar(value=str(context_size))
         self.temperature = tk.StringVar(value=str(temperature))
@@ -230,28 +300,45 @@ class LokiSettingsDialog(tk.Toplevel):
     def on_cancel(self):
         """Handle Cancel button click."""
         self.destroy()
+    
+    def destroy(self):
+        """Close the dialog and allow a new one to be opened."""
+        LokiSettingsDialog._instance = None
+        super().destroy()
 
 
 class StreamingSubprocessRunner:
     """Class to handle running subprocesses with streaming output."""
     
-    def __init__(self, cmd, output_callback, completion_callback=None):
-        """Initialize with command and callbacks."""
+    def __init__(self, cmd, output_callback, completion_callback=None, partial_callback=None, executor=None):
+        """Initialize with command and callbacks.
+        
+        partial_callback, if given, is offered unfinished lines (such as LLM tokens
+        printed without a newline) as soon as they arrive. It returns True to take
+        the text; the rest of that line is then passed to it as well.
+        
+        executor, if given, runs the reader on a pooled thread instead of a new one.
+        """
         self.cmd = cmd
         self.output_callback = output_callback
         self.completion_callback = completion_callback
+        self.partial_callback = partial_callback
+        self.executor = executor
         self.process = None
         self.thread = None
         self.running = False
     
     def start(self):
-        """Start the subprocess in a new thread."""
+        """Start the subprocess on the executor, or in a new thread."""
         if self.running:
             return False
         
         self.running = True
-        self.thread = threading.Thread(target=self._run_process, daemon=True)
-        self.thread.start()
+        if self.executor is not None:
+            self.executor.submit(self._run_process)
+        else:
+            self.thread = threading.Thread(target=self._run_process, daemon=True)
+            self.thread.start()
         return True
     
     def _run_process(self):
@@ -262,15 +349,39 @@ class StreamingSubprocessRunner:
                 self.cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                bufsize=0
             )
             
-            # Read output line by line as it's generated
-            for line in iter(self.process.stdout.readline, ''):
-                if self.output_callback:
-                    self.output_callback(line)
+            # Read output as it's generated, decoding incrementally so characters split
+            # across reads survive; \r\n and \r become \n as in text mode
+            decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+            pending = ""
+            streamed = False
+            while True:
+                data = self.process.stdout.read(4096)
+                pending += decoder.decode(data, final=not data)
+                
+                # Deliver every completed line
+                lines = pending.split("\n")
+                pending = lines.pop()
+                for line in lines:
+                    self._deliver(line + "\n", streamed)
+                    streamed = False
+                
+                if not data:
+                    if pending:
+                        self._deliver(pending, streamed)
+                    break
+                
+                # Offer the unfinished line to the partial callback
+                if pending and self.partial_callback:
+                    if streamed:
+                        self.partial_callback(pending)
+                        pending = ""
+                    elif self.partial_callback(pending):
+                        streamed = True
+                        pending = ""
             
             # Process has completed, close stdout and get return code
             self.process.stdout.close()
@@ -289,6 +400,13 @@ class StreamingSubprocessRunner:
         finally:
             self.running = False
     
+    def _deliver(self, text, streamed):
+        """Pass a finished line on, continuing through partial_callback if it was streamed."""
+        if streamed:
+            self.partial_callback(text)
+        elif self.output_callback:
+            self.output_callback(text)
+    
     def stop(self):
         """Stop the subprocess if it's running."""
         if self.running and self.process:
@@ -296,11 +414,11 @@ class StreamingSubprocessRunner:
                 # Try to terminate gracefully first
                 self.process.terminate()
                 
-                # Give it a moment to terminate
-                time.sleep(0.5)
-                
-                # If still running, kill it
-                if self.process.poll() is None:
+                # Give it up to a moment to terminate, returning as soon as it exits
+                try:
+                    self.process.wait(timeout=0.5)
+                except subprocess.TimeoutExpired:
+                    # Still running, kill it
                     self.process.kill()
                 
                 return True
@@ -312,6 +430,40 @@ class StreamingSubprocessRunner:
 class LokiGUI(ctk.CTk):
     """Main LOKI GUI application."""
     
+    # File types offered when browsing for a model
+    _MODEL_FILETYPES = (("Model Files", "*.gguf *.bin"), ("All Files", "*.*"))
+    
+    # Output lines hidden from the chat, each list compiled into one pattern
+    _SEARCH_SKIP_RE = re.compile("|".join(map(re.escape, [
+        "Loading LOKI Vector Database",
+        "Vector database loaded",
+        "Creation date",
+        "Total chunks",
+        "Index type",
+        "Ignoring outdated",
+        "Loading embedding model",
+        "Loading ONNX embedding model"
+    ])))
+    _VECTOR_LLM_SKIP_RE = re.compile("|".join(map(re.escape, [
+        "Loading embedding model",
+        "Total documents",
+        "Loading LLM model",
+        "llama_context",
+        "n_ctx_per_seq"
+    ])))
+    _LLM_SKIP_RE = re.compile("|".join(map(re.escape, [
+        "Loading LOKI Vector Database",
+        "Vector database loaded",
+        "Creation date",
+        "Total chunks",
+        "Loading LLM model",
+        "This may take a few moments",
+        "llama_context",
+        "Found",
+        "relevant documents",
+        "Generating answer"
+    ])))
+    
     def __init__(self):
         """Initialize the LOKI GUI."""
         super().__init__()
@@ -322,7 +474,7 @@ class LokiGUI(ctk.CTk):
         self.minsize(800, 600)
         
         # Set paths
-        self.loki_dir = '/home/mike/LOKI'
+        self.loki_dir = LOKI_DIR
         self.vector_db_dir = os.path.join(self.loki_dir, 'vector_db')
         self.logs_dir = os.path.join(self.loki_dir, 'logs')
         self.llm_dir = os.path.join(self.loki_dir, 'LLM')
@@ -344,9 +496,36 @@ class LokiGUI(ctk.CTk):
         # Track current subprocess runner
         self.current_process = None
         
+        # Persistent pool for fire-and-forget file system work off the Tk thread
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="loki-io")
+        
+        # Reused thread for reading subprocess output (handle_input allows one search at a time)
+        self._runner_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="loki-runner")
+        
+        # File name -> path index of the DATABASE tree, built on first use
+        self._source_index = None
+        self._source_index_lock = threading.Lock()
+        self._source_index_from_disk = False
+        self._source_index_path = os.path.join(self.loki_dir, ".source_index.pkl")
+        
+        # Log timestamp, reformatted only when the wall-clock second changes
+        self._log_second = 0
+        self._log_stamp = ""
+        
+        # Log display lines waiting for the next batched insert
+        self._log_buffer = deque()
+        self._log_flush_scheduled = False
+        
+        # Set once the LLM starts printing its answer, so tokens stream mid-line
+        self._answer_streaming = False
+        self._partial_line = []
+        
         # Track if waiting for a source number
         self.expecting_source_number = False
         
+        # Stop searches and worker threads when the window is closed
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Create UI components
         self.create_menu()
         self.create_main_frame()
@@ -354,9 +533,10 @@ class LokiGUI(ctk.CTk):
         # Check if vector database exists
         self.check_vector_database()
         
-        # Find available models
-        self.available_models = self.find_models()
-        self.update_model_dropdown()
+        # Find available models in the background; the dropdown shows a placeholder until then
+        self.available_models = []
+        self._model_basename_to_path = {}
+        self._io_pool.submit(self._find_models_background)
         
         # Write initial message
         self.chat_text.append_message("Welcome to LOKI - Localized Offline Knowledge Interface", "system")
@@ -376,7 +556,7 @@ class LokiGUI(ctk.CTk):
         file_menu.add_command(label="Check Database Status", command=self.check_vector_database)
         file_menu.add_command(label="Select Model File", command=self.browse_model)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         
         # Edit menu
         edit_menu = tk.Menu(menubar, tearoff=0)
@@ -434,7 +614,8 @@ class LokiGUI(ctk.CTk):
         model_label = ctk.CTkLabel(mode_frame, text="LLM Model:")
         model_label.pack(side=tk.LEFT, padx=(20, 5))
         
-        self.model_dropdown = ctk.CTkOptionMenu(mode_frame, width=250, values=["No models found"])
+        self.model_dropdown = ctk.CTkOptionMenu(mode_frame, width=250, values=["Loading models..."],
+                                                command=self.on_model_selected)
         self.model_dropdown.pack(side=tk.LEFT, padx=5)
         
         model_browse = ctk.CTkButton(mode_frame, text="Browse...", command=self.browse_model)
@@ -513,6 +694,11 @@ class LokiGUI(ctk.CTk):
         
         if not user_input:
             return
+        
+        # Only one search runs at a time; keep the text so it can be sent afterwards
+        if self.current_process is not None and self.current_process.running:
+            self.chat_text.append_message("Please wait for the current search to finish.", "system")
+            return
             
         # Clear input field
         self.input_field.delete("1.0", tk.END)
@@ -530,13 +716,20 @@ class LokiGUI(ctk.CTk):
     
     def show_llm_settings(self):
         """Show dialog to configure LLM settings."""
-        dialog = LokiSettingsDialog(
-            self, 
-            context_size=int(self.context_size.get()),
-            temperature=float(self.temperature.get())
-        )
+        # Bring an already open dialog to the front instead of building another
+        if LokiSettingsDialog._instance is not None and LokiSettingsDialog._instance.winfo_exists():
+            LokiSettingsDialog._instance.lift()
+            LokiSettingsDialog._instance.focus_force()
+            return
+        
+        current = {
+            "context_size": int(self.context_size.get()),
+            "temperature": float(self.temperature.get())
+        }
+        dialog = LokiSettingsDialog(self, **current)
         
-        if dialog.result:
+        # OK without changes leaves the settings (and the log) untouched
+        if dialog.result and dialog.result != current:
             self.context_size.set(str(dialog.result["context_size"]))
             self.temperature.set(str(dialog.result["temperature"]))
             self.log(f"Settings updated: Context Size={dialog.result['context_size']}, Temperature={dialog.result['temperature']}")
@@ -573,19 +766,38 @@ class LokiGUI(ctk.CTk):
     
     def log(self, message):
         """Add a message to both the log file and log display."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = int(time.time())
+        if now != self._log_second:
+            self._log_second = now
+            self._log_stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        timestamp = self._log_stamp
         
         # Make sure the logs directory exists
         os.makedirs(self.logs_dir, exist_ok=True)
         
-        # Write to the log file
-        log_file = os.path.join(self.logs_dir, f"loki_gui_{datetime.now().strftime('%Y-%m-%d')}.log")
+        # Write to the log file (named by the date part of the timestamp)
+        log_file = os.path.join(self.logs_dir, f"loki_gui_{timestamp[:10]}.log")
         with open(log_file, 'a', encoding='utf-8') as f:
             f.write(f"[{timestamp}] {message}\n")
         
-        # Also update the log display
+        # Also update the log display, batching bursts of messages into one insert
+        self._log_buffer.append(f"[{timestamp[11:]}] {message}\n")
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.after(100, self._flush_log)
+    
+    def _flush_log(self):
+        """Write all buffered log lines to the log display at once."""
+        self._log_flush_scheduled = False
+        lines = []
+        while self._log_buffer:
+            lines.append(self._log_buffer.popleft())
+        if not lines:
+            return
+        
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n")
+        self.log_text.insert(tk.END, "".join(lines))
+        self.log_text.trim_lines()
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
     
@@ -641,46 +853,79 @@ class LokiGUI(ctk.CTk):
         model_dirs = [
             os.path.join(self.loki_dir, 'LLM', 'models'),
             os.path.join(self.loki_dir, 'models'),
-            os.path.expanduser("~/models"),
-            os.path.expanduser("~/.cache/lm-studio/models")
+            os.path.join(HOME_DIR, "models"),
+            os.path.join(HOME_DIR, ".cache", "lm-studio", "models")
         ]
         
-        extensions = [".gguf", ".bin"]
+        extensions = (".gguf", ".bin")
         models = []
+        seen = set()
         
-        # First, add all models directly in the models folder
-        for ext in extensions:
-            for model_file in glob.glob(os.path.join(self.models_dir, f"*{ext}")):
-                models.append(model_file)
+        def add_models(paths):
+            # Group by extension, .gguf first
+            for ext in extensions:
+                for model_path in paths:
+                    if model_path.endswith(ext) and model_path not in seen:
+                        seen.add(model_path)
+                        models.append(model_path)
+        
+        # First, add all models directly in the models folder (a single directory listing)
+        try:
+            with os.scandir(self.models_dir) as entries:
+                add_models([entry.path for entry in entries
+                            if not entry.name.startswith(".") and entry.is_file()])
+        except OSError:
+            pass
         
         # Then check other directories
         for directory in model_dirs:
             if not os.path.exists(directory) or directory == self.models_dir:
                 continue
             
-            for ext in extensions:
-                for model_file in Path(directory).glob(f"**/*{ext}"):
-                    model_path = str(model_file)
-                    if model_path not in models:
-                        models.append(model_path)
+            add_models([os.path.join(root, name)
+                        for root, dirs, files in os.walk(directory)
+                        for name in files])
         
-        if models:
+        return models
+    
+    def _find_models_background(self):
+        """Scan for models off the Tk thread and hand the result (or error) back to it."""
+        try:
+            models, error = self.find_models(), None
+        except Exception as e:
+            models, error = [], e
+        self.after(0, self._apply_found_models, models, error)
+    
+    def _apply_found_models(self, models, error=None):
+        """Show the scanned models, keeping any model browsed to while scanning."""
+        if error is not None:
+            self.log(f"Error scanning for models: {str(error)}")
+        elif models:
             self.log(f"Found {len(models)} model(s)")
             for model in models:
                 self.log(f"  - {os.path.basename(model)}")
         else:
             self.log("No models found in standard locations")
         
-        return models
+        current_name = self.model_dropdown.get()
+        self.available_models = models + [m for m in self.available_models if m not in models]
+        self.update_model_dropdown()
+        if current_name in self._model_basename_to_path:
+            self.model_dropdown.set(current_name)
     
     def update_model_dropdown(self):
         """Update the model dropdown with available models."""
+        # Dropdown name -> model path, in discovery order; the first model with a given name wins
+        self._model_basename_to_path = {}
+        for model_path in self.available_models:
+            self._model_basename_to_path.setdefault(os.path.basename(model_path), model_path)
+        
         if not self.available_models:
             self.model_dropdown.configure(values=["No models found"])
             self.model_dropdown.set("No models found")
             return
         
-        model_names = [os.path.basename(m) for m in self.available_models]
+        model_names = list(self._model_basename_to_path)
         self.model_dropdown.configure(values=model_names)
         self.model_dropdown.set(model_names[0])  # Select the first model
     
@@ -688,7 +933,7 @@ class LokiGUI(ctk.CTk):
         """Open a file dialog to select a model file."""
         file_path = filedialog.askopenfilename(
             title="Select LLM Model File",
-            filetypes=[("Model Files", "*.gguf *.bin"), ("All Files", "*.*")]
+            filetypes=self._MODEL_FILETYPES
         )
         
         if file_path:
@@ -696,28 +941,44 @@ class LokiGUI(ctk.CTk):
             self.log(f"Selected model: {os.path.basename(file_path)}")
             
             # Add to dropdown if not already there
-            if file_path not in self.available_models:
+            model_name = os.path.basename(file_path)
+            if model_name not in self._model_basename_to_path:
                 self.available_models.append(file_path)
                 self.update_model_dropdown()
             
             # Set the dropdown to the selected model
-            model_name = os.path.basename(file_path)
-            for i, name in enumerate(self.model_dropdown.cget("values")):
-                if name == model_name:
-                    self.model_dropdown.set(name)
-                    break
+            self.model_dropdown.set(model_name)
+            self.on_model_selected(model_name)
+    
+    def on_model_selected(self, model_name):
+        """Start reading the chosen model into the page cache before it is needed."""
+        model_path = self._model_basename_to_path.get(model_name)
+        if model_path:
+            self._io_pool.submit(self._prefetch_file, model_path)
+    
+    @staticmethod
+    def _prefetch_file(file_path):
+        """Ask the kernel to read a file into the page cache in the background (POSIX only)."""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        with contextlib.suppress(OSError):
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
     
     def get_selected_model_path(self):
         """Get the path of the selected model."""
         model_name = self.model_dropdown.get()
         
-        if model_name in ["No models found"]:
+        if model_name in ["No models found", "Loading models..."]:
             return None
         
         # Find the model path based on name
-        for path in self.available_models:
-            if os.path.basename(path) == model_name:
-                return path
+        model_path = self._model_basename_to_path.get(model_name)
+        if model_path:
+            return model_path
         
         # If a specific path was manually selected
         if self.selected_model_path.get():
@@ -727,10 +988,11 @@ class LokiGUI(ctk.CTk):
     
     def perform_search(self, query):
         """Execute a search based on the current mode."""
-        if self.search_mode.get() == "llm_chat" and not self.check_llm_available():
+        mode = self.search_mode.get()
+        if mode == "llm_chat" and not self.check_llm_available():
             return
             
-        if self.search_mode.get() != "llm_chat" and not self.check_vector_database():
+        if mode != "llm_chat" and not self.check_vector_database():
             return
         
         # Display user query
@@ -739,13 +1001,12 @@ class LokiGUI(ctk.CTk):
         # Update status
         self.status_text.set("Processing...")
         
-        # Choose search method based on mode
-        if self.search_mode.get() == "vector":
-            self.run_vector_search(query)
-        elif self.search_mode.get() == "vector_llm":
-            self.run_llm_search(query)
-        else:  # llm_chat mode
-            self.run_llm_chat(query)
+        # Choose search method based on mode (llm_chat is the fallback)
+        search_methods = {
+            "vector": self.run_vector_search,
+            "vector_llm": self.run_llm_search
+        }
+        search_methods.get(mode, self.run_llm_chat)(query)
     
     def check_llm_available(self):
         """Check if an LLM model is selected and available."""
@@ -766,8 +1027,9 @@ class LokiGUI(ctk.CTk):
         
         # Build command
         cmd = [
-            "python3", 
+            sys.executable,
             os.path.join(self.loki_dir, "loki_search.py"),
+            "--db-path", self.vector_db_dir,
             "--query", query
         ]
         
@@ -777,6 +1039,7 @@ class LokiGUI(ctk.CTk):
         # Create and start the subprocess runner
         self.current_process = StreamingSubprocessRunner(
             cmd=cmd,
+            executor=self._runner_pool,
             output_callback=self.process_search_output,
             completion_callback=self.search_completed
         )
@@ -796,18 +1059,16 @@ class LokiGUI(ctk.CTk):
             return
         
         # Create script for modified search that shows sources and then LLM response
-        temp_script = tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.py')
+        temp_script = tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.py', dir=TEMP_DIR)
         temp_script.write(f'''
 import os
 import sys
 import json
-import time
-import subprocess
-from pathlib import Path
 
 # Ensure the necessary packages are available
 try:
     import faiss
+    import numpy as np
     from sentence_transformers import SentenceTransformer
 except ImportError:
     print("Error: Missing required packages. Please install with:")
@@ -815,14 +1076,19 @@ except ImportError:
     sys.exit(1)
 
 try:
+    import llama_cpp
     from llama_cpp import Llama
     LLAMA_CPP_AVAILABLE = True
 except ImportError:
     LLAMA_CPP_AVAILABLE = False
     print("LLama CPP not available, running in search-only mode")
 
+# Retrieved chunks with a cosine similarity above this to an already kept chunk
+# are dropped as near-duplicates
+DUPLICATE_SIMILARITY = 0.95
+
 # Vector search function
-def vector_search(query, vector_db_path="/home/mike/LOKI/vector_db", top_k=5):
+def vector_search(query, vector_db_path={self.vector_db_dir!r}, top_k=5, context_size=8192):
     # Load the vector database
     try:
         # Load embedding model
@@ -852,20 +1118,49 @@ def vector_search(query, vector_db_path="/home/mike/LOKI/vector_db", top_k=5):
                 print(f"Total documents: {{db_info.get('num_documents', len(chunks))}}")
         
         # Encode the query
-        query_embedding = model.encode([query])[0].reshape(1, -1)
+        query_embedding = model.encode([query], normalize_embeddings=True)
         
-        # Search the index
-        distances, indices = index.search(query_embedding, top_k)
+        # Search the index, over-fetching so near-duplicates can be dropped
+        distances, indices = index.search(query_embedding, top_k * 2)
+        
+        # Keep the retrieved context within ~60% of the LLM context window
+        # (roughly 4 characters per token) to bound prompt prefill cost
+        char_budget = int(context_size * 0.6) * 4
+        used_chars = 0
+        kept_vectors = []
         
         # Format the results
         results = []
         sources = []
         for i, idx in enumerate(indices[0]):
+            if len(results) >= top_k:
+                break
             if idx >= 0 and idx < len(chunks):
                 chunk = chunks[idx]
+                
+                # Skip near-duplicates of an already kept chunk (e.g. adjacent pages)
+                try:
+                    vector = index.reconstruct(int(idx))
+                    vector = vector / (np.linalg.norm(vector) or 1.0)
+                except RuntimeError:
+                    vector = None
+                if vector is not None and any(float(np.dot(vector, kept)) > DUPLICATE_SIMILARITY for kept in kept_vectors):
+                    continue
+                
+                # Stop once the prompt budget is spent
+                if results and used_chars + len(chunk) > char_budget:
+                    break
+                if vector is not None:
+                    kept_vectors.append(vector)
+                used_chars += len(chunk)
+                
                 meta = metadata[idx]
                 distance = float(distances[0][i])
-                similarity = 1.0 / (1.0 + distance)
+                if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+                    similarity = distance  # Cosine similarity (normalized vectors)
+                else:
+                    similarity = 1.0 - distance / 2.0  # Squared L2 between normalized vectors
+                source_num = len(results) + 1
                 
                 # Format source information
                 category = meta.get("category", "Unknown").replace("library-", "")
@@ -880,7 +1175,7 @@ def vector_search(query, vector_db_path="/home/mike/LOKI/vector_db", top_k=5):
                 }})
                 
                 # Display source information
-                print(f"\\n[Source {{i+1}}: {{category}}/{{file_name}}]")
+                print(f"\\n[Source {{source_num}}: {{category}}/{{file_name}}]")
                 print(f"  Page        {{page_num}}")
                 print(f"  Relevance   {{similarity*100:.1f}}%")
                 print()
@@ -891,7 +1186,7 @@ def vector_search(query, vector_db_path="/home/mike/LOKI/vector_db", top_k=5):
                 print("\\n" + "-"*50 + "\\n")
                 
                 # Save source info for LLM
-                sources.append(f"[Source {{i+1}}: {{category}}/{{file_name}}, Page {{page_num}}, Relevance: {{similarity*100:.1f}}%]\\n{{chunk}}\\n")
+                sources.append(f"[Source {{source_num}}: {{category}}/{{file_name}}, Page {{page_num}}, Relevance: {{similarity*100:.1f}}%]\\n{{chunk}}\\n")
         
         return results, "\\n".join(sources)
     
@@ -913,6 +1208,12 @@ def run_llm(query, context, model_path="{model_path}", context_size={self.contex
         model = Llama(
             model_path=model_path,
             n_ctx=context_size,
+            n_threads=max(1, (os.cpu_count() or 2) // 2),  # Physical cores on SMT machines
+            n_batch=512,
+            # Offload every layer when llama.cpp was built with GPU (CUDA/Metal/Vulkan) support
+            n_gpu_layers=-1 if getattr(llama_cpp, "llama_supports_gpu_offload", lambda: False)() else 0,
+            use_mmap=True,  # Page weights in on demand instead of reading the whole file up front
+            use_mlock=False,
             verbose=False
         )
         
@@ -960,7 +1261,7 @@ if __name__ == "__main__":
     query = "{query}"
     
     # Perform vector search
-    results, context = vector_search(query)
+    results, context = vector_search(query, context_size={self.context_size.get()})
     
     if context:
         # Run LLM with context
@@ -970,12 +1271,9 @@ if __name__ == "__main__":
 ''')
         temp_script.close()
         
-        # Make the script executable
-        os.chmod(temp_script.name, 0o755)
-        
         # Build command
         cmd = [
-            "python3", 
+            sys.executable,
             temp_script.name
         ]
         
@@ -985,9 +1283,12 @@ if __name__ == "__main__":
         # Create and start the subprocess runner
         self.current_process = StreamingSubprocessRunner(
             cmd=cmd,
+            executor=self._runner_pool,
             output_callback=self.process_vector_llm_output,
-            completion_callback=lambda rc: self.vector_llm_completed(rc, temp_script.name)
+            completion_callback=lambda rc: self.vector_llm_completed(rc, temp_script.name),
+            partial_callback=self.process_partial_output
         )
+        self._answer_streaming = False
         self.current_process.start()
     
     def run_llm_chat(self, query):
@@ -1003,7 +1304,7 @@ if __name__ == "__main__":
         
         # Build command for direct LLM chat
         # Create a temporary prompt file to avoid command line length issues
-        temp_file = tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.txt')
+        temp_file = tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.txt', dir=TEMP_DIR)
         
         # Write the prompt to the temp file
         prompt = f"""You are LOKI (Localized Offline Knowledge Interface), an AI assistant specializing in survival and practical knowledge.
@@ -1018,10 +1319,12 @@ LOKI:"""
         
         # Build command
         cmd = [
-            "python3", 
+            sys.executable,
             "-c",
             f"""
+import os
 import sys
+import llama_cpp
 from llama_cpp import Llama
 
 try:
@@ -1030,6 +1333,12 @@ try:
     model = Llama(
         model_path="{model_path}",
         n_ctx={self.context_size.get()},
+        n_threads=max(1, (os.cpu_count() or 2) // 2),  # Physical cores on SMT machines
+        n_batch=512,
+        # Offload every layer when llama.cpp was built with GPU (CUDA/Metal/Vulkan) support
+        n_gpu_layers=-1 if getattr(llama_cpp, "llama_supports_gpu_offload", lambda: False)() else 0,
+        use_mmap=True,  # Page weights in on demand instead of reading the whole file up front
+        use_mlock=False,
         verbose=False
     )
     print("Model loaded and ready")
@@ -1064,9 +1373,12 @@ except Exception as e:
         # Create and start the subprocess runner
         self.current_process = StreamingSubprocessRunner(
             cmd=cmd,
+            executor=self._runner_pool,
             output_callback=self.process_chat_output,
-            completion_callback=lambda rc: self.chat_completed(rc, temp_file.name)
+            completion_callback=lambda rc: self.chat_completed(rc, temp_file.name),
+            partial_callback=self.process_partial_output
         )
+        self._answer_streaming = False
         self.current_process.start()
     
     def process_search_output(self, line):
@@ -1075,13 +1387,7 @@ except Exception as e:
         self.log(line.strip())
         
         # Skip system info lines that contain database loading info
-        if any(skip_text in line for skip_text in [
-            "Loading LOKI Vector Database", 
-            "Vector database loaded", 
-            "Creation date", 
-            "Total chunks",
-            "Loading embedding model"
-        ]):
+        if self._SEARCH_SKIP_RE.search(line):
             return
             
         # Process source information
@@ -1137,13 +1443,7 @@ except Exception as e:
         self.log(line.strip())
         
         # Skip system info lines about loading
-        if any(skip_text in line for skip_text in [
-            "Loading embedding model", 
-            "Total documents",
-            "Loading LLM model",
-            "llama_context",
-            "n_ctx_per_seq"
-        ]):
+        if self._VECTOR_LLM_SKIP_RE.search(line):
             return
             
         # Replace "Model loaded successfully" with "Model loaded and ready"
@@ -1227,6 +1527,7 @@ except Exception as e:
             
         # Check if line starts with "Generating answer..." and skip it
         if "Generating answer" in line:
+            self._answer_streaming = True
             return
         
         # Normal text output
@@ -1238,18 +1539,7 @@ except Exception as e:
         self.log(line.strip())
         
         # Skip system info lines
-        if any(skip_text in line for skip_text in [
-            "Loading LOKI Vector Database", 
-            "Vector database loaded", 
-            "Creation date", 
-            "Total chunks",
-            "Loading LLM model",
-            "This may take a few moments",
-            "llama_context",
-            "Found",
-            "relevant documents",
-            "Generating answer"
-        ]):
+        if self._LLM_SKIP_RE.search(line):
             return
             
         # Replace "Model loaded successfully" with "Model loaded and ready"
@@ -1354,11 +1644,31 @@ except Exception as e:
             
         # Skip "Generating response" message
         if "Generating response" in line:
+            self._answer_streaming = True
             return
             
         # Stream directly to the chat window
         self.chat_text.append_streaming_text(line)
     
+    def process_partial_output(self, text):
+        """Stream unfinished lines of the LLM answer straight to the chat window."""
+        if not self._answer_streaming:
+            return False
+        
+        # Log the answer a line at a time, as complete lines are
+        self._partial_line.append(text)
+        if text.endswith("\n"):
+            self._log_partial_line()
+        
+        self.chat_text.append_streaming_text(text)
+        return True
+    
+    def _log_partial_line(self):
+        """Log the streamed text of the current line, if any."""
+        if self._partial_line:
+            self.log("".join(self._partial_line).strip())
+            self._partial_line.clear()
+    
     def search_completed(self, return_code):
         """Handle search process completion."""
         if return_code == 0:
@@ -1374,11 +1684,10 @@ except Exception as e:
     
     def vector_llm_completed(self, return_code, temp_file):
         """Handle vector+LLM process completion and clean up."""
-        try:
-            # Remove temporary file
-            os.unlink(temp_file)
-        except:
-            pass
+        # Remove temporary file (this runs on the runner's reader thread)
+        self._remove_temp_file(temp_file)
+        
+        self._log_partial_line()
         
         # Update status
         if return_code == 0:
@@ -1394,11 +1703,10 @@ except Exception as e:
     
     def chat_completed(self, return_code, temp_file):
         """Handle chat process completion and clean up temp files."""
-        try:
-            # Remove temporary file
-            os.unlink(temp_file)
-        except:
-            pass
+        # Remove temporary file (this runs on the runner's reader thread)
+        self._remove_temp_file(temp_file)
+        
+        self._log_partial_line()
         
         # Update status
         if return_code == 0:
@@ -1412,6 +1720,11 @@ except Exception as e:
         # Clear the current process
         self.current_process = None
     
+    def _remove_temp_file(self, temp_file):
+        """Delete a temporary file, ignoring files that are already gone."""
+        with contextlib.suppress(OSError):
+            os.unlink(temp_file)
+    
     def open_source(self, source_num):
         """Open a source file by its reference number."""
         if source_num in self.chat_text.sources:
@@ -1430,8 +1743,9 @@ except Exception as e:
                 self.log("Error: Missing category or file name")
                 return
             
-            # Construct potential file paths
-            potential_paths = [
+            # Construct potential file paths (deduplicated, since the database
+            # directory is usually ~/DATABASE itself)
+            potential_paths = dict.fromkeys([
                 # Try DATABASE/survivorlibrary/category/filename
                 os.path.join(self.database_dir, "survivorlibrary", category, file_name),
                 
@@ -1442,32 +1756,22 @@ except Exception as e:
                 os.path.join(self.database_dir, file_name),
                 
                 # Also try without the database path
-                os.path.join("/home/mike/DATABASE/survivorlibrary", category, file_name),
-                os.path.join("/home/mike/DATABASE", category, file_name),
-                os.path.join("/home/mike/DATABASE", file_name),
+                os.path.join(HOME_DIR, "DATABASE", "survivorlibrary", category, file_name),
+                os.path.join(HOME_DIR, "DATABASE", category, file_name),
+                os.path.join(HOME_DIR, "DATABASE", file_name),
                 
                 # Try just with category and filename
                 os.path.join(category, file_name),
-            ]
+            ])
             
             # Find the first path that exists
-            file_path = None
-            for path in potential_paths:
-                if os.path.exists(path):
-                    file_path = path
-                    break
+            file_path = next((path for path in potential_paths if os.path.exists(path)), None)
             
             if not file_path:
                 # Try a more extensive search
-                self.chat_text.append_message(f"Searching for file {file_name}...", "system")
-                
-                found_files = []
-                for root, dirs, files in os.walk(self.database_dir):
-                    if file_name in files:
-                        found_files.append(os.path.join(root, file_name))
-                
-                if found_files:
-                    file_path = found_files[0]  # Take the first match
+                if self._source_index is None:
+                    self.chat_text.append_message(f"Searching for file {file_name}...", "system")
+                file_path = self._find_in_database(file_name)
                 
             if not file_path:
                 self.log(f"Error: Could not find file {file_name} in category {category}")
@@ -1477,17 +1781,128 @@ except Exception as e:
             # Open the file
             self.log(f"Opening source file: {file_path}")
             self.chat_text.append_message(f"Opening {file_name}...", "system")
+            self._io_pool.submit(self._launch_file, file_path)
+        
+        except Exception as e:
+            self.log(f"Error opening source file: {str(e)}")
+            self.chat_text.append_message(f"Error opening file: {str(e)}", "error")
+    
+    def _find_in_database(self, file_name):
+        """Look up a file anywhere under the DATABASE directory, indexing the tree on first use."""
+        with self._source_index_lock:
+            if self._source_index is None:
+                self._source_index = self._load_source_index()
+                self._source_index_from_disk = self._source_index is not None
+                if self._source_index is None:
+                    self._rebuild_source_index()
+            
+            file_path = self._source_index.get(file_name)
             
+            # A saved index can miss changes below the category folders; rescan once
+            if self._source_index_from_disk and (file_path is None or not os.path.exists(file_path)):
+                self._rebuild_source_index()
+                file_path = self._source_index.get(file_name)
+            return file_path
+    
+    def _database_signature(self):
+        """Return the modification times of the DATABASE directory and its category folders."""
+        signature = [(self.database_dir, os.stat(self.database_dir).st_mtime_ns)]
+        with os.scandir(self.database_dir) as entries:
+            signature += sorted((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns)
+                                for entry in entries if entry.is_dir(follow_symlinks=False))
+        return signature
+    
+    def _load_source_index(self):
+        """Load the saved source index if the DATABASE tree has not changed since it was written."""
+        try:
+            with open(self._source_index_path, 'rb') as f:
+                saved = pickle.load(f)
+            if saved["signature"] == self._database_signature():
+                return saved["index"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+            pass
+        return None
+    
+    def _rebuild_source_index(self):
+        """Rescan the DATABASE tree and save the result for the next start."""
+        try:
+            signature = self._database_signature()
+        except OSError:
+            signature = None
+        self._source_index = self._scan_database_files()
+        self._source_index_from_disk = False
+        
+        if signature is None:
+            return
+        tmp_path = f"{self._source_index_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"signature": signature, "index": self._source_index}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._source_index_path)
+        except OSError as e:
+            self.log(f"Could not save source index: {str(e)}")
+    
+    def _scan_database_files(self):
+        """Map every file name under the DATABASE directory to its first path (os.walk order)."""
+        if getattr(sys, "_is_gil_enabled", lambda: True)():
+            return self._scan_tree(self.database_dir)
+        
+        # Free-threaded interpreter: scan the top-level category folders in parallel,
+        # then merge in directory order so the first match stays the same
+        source_index, subdirs = self._scan_tree(self.database_dir, recursive=False)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            for subdir_index in pool.map(self._scan_tree, subdirs):
+                for name, path in subdir_index.items():
+                    source_index.setdefault(name, path)
+        return source_index
+    
+    @staticmethod
+    def _scan_tree(root, recursive=True):
+        """Map file names under root to their first path, using an os.scandir stack.
+        
+        With recursive=False, only root itself is listed and its subdirectories are
+        returned alongside the mapping.
+        """
+        # scandir's DirEntry knows the entry type, so no per-file stat is needed
+        source_index = {}
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        else:
+                            source_index.setdefault(entry.name, entry.path)
+            except OSError:
+                continue
+            if not recursive:
+                return source_index, subdirs
+            stack.extend(reversed(subdirs))
+        return source_index if recursive else (source_index, [])
+    
+    def _launch_file(self, file_path):
+        """Open a file with the system viewer without waiting for it (runs on the IO pool)."""
+        try:
             if platform.system() == "Windows":
                 os.startfile(file_path)
+                return
             elif platform.system() == "Darwin":  # macOS
-                subprocess.Popen(["open", file_path])
+                cmd = ["open", file_path]
             else:  # Linux
-                subprocess.Popen(["xdg-open", file_path])
-        
+                cmd = ["xdg-open", file_path]
+            
+            subprocess.Popen(
+                cmd,
+                start_new_session=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
         except Exception as e:
             self.log(f"Error opening source file: {str(e)}")
-            self.chat_text.append_message(f"Error opening file: {str(e)}", "error")
     
     def clear_chat(self):
         """Clear the chat display."""
@@ -1612,6 +2027,16 @@ except Exception as e:
             "An offline database of indexed survival information with LLM integration."
         )
     
+    def on_close(self):
+        """Stop any running search, shut down the worker pools and close the window."""
+        if self.current_process:
+            self.current_process.stop()
+        # Nothing is ever queued behind the running search, so its reader still gets
+        # to run the completion callback (removing its temp file)
+        self._runner_pool.shutdown(wait=False)
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+    
     def show_help(self):
         """Show the help dialog."""
         help_text = """
@@ -52,6 +52,17 @@ def extract_chunks_from_files(json_files, batch_size=32):
     
     return all_chunks, all_metadata
 
+def remove_derived_stores(output_dir):
+    """Delete files migrate_vector_db.py derived from a previous database, including its flat index backup."""
+    derived_files = ("chunks.bin", "chunks_offsets.npy", "metadata.bin", "metadata_offsets.npy",
+                     "chunks.arrow", "categories.npy", "file_names.npy", "page_nums.npy",
+                     "faiss_index.flat.bin")
+    for name in derived_files:
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed outdated {name}")
+
 def create_vector_database(chunks, metadata, model_name, output_dir, batch_size=32):
     """Create vector database using FAISS."""
     # Load the sentence transformer model
@@ -62,9 +73,9 @@ def create_vector_database(chunks, metadata, model_name, output_dir, batch_size=
     embedding_dim = model.get_sentence_embedding_dimension()
     print(f"Embedding dimension: {embedding_dim}")
     
-    # Create FAISS index
+    # Create FAISS index (normalized vectors, so inner product = cosine similarity)
     print("Creating FAISS index")
-    index = faiss.IndexFlatL2(embedding_dim)
+    index = faiss.IndexFlatIP(embedding_dim)
     
     # Process chunks in batches to generate embeddings
     all_embeddings = []
@@ -72,7 +83,7 @@ def create_vector_database(chunks, metadata, model_name, output_dir, batch_size=
     
     for i in tqdm(range(0, total_chunks, batch_size), desc="Generating embeddings"):
         batch_chunks = chunks[i:i+batch_size]
-        batch_embeddings = model.encode(batch_chunks)
+        batch_embeddings = model.encode(batch_chunks, normalize_embeddings=True)
         all_embeddings.append(batch_embeddings)
     
     # Concatenate all embeddings
@@ -83,6 +94,7 @@ def create_vector_database(chunks, metadata, model_name, output_dir, batch_size=
     
     # Save the index, chunks, and metadata
     os.makedirs(output_dir, exist_ok=True)
+    remove_derived_stores(output_dir)
     
     faiss.write_index(index, os.path.join(output_dir, "faiss_index.bin"))
     
@@ -97,6 +109,7 @@ def create_vector_database(chunks, metadata, model_name, output_dir, batch_size=
         "creation_date": datetime.now().isoformat(),
         "model_name": model_name,
         "embedding_dim": embedding_dim,
+        "metric": "cosine",
         "num_chunks": total_chunks,
         "num_documents": len(set(m['file_path'] for m in metadata))
     }
@@ -111,7 +124,7 @@ def test_query(query, index, chunks, metadata, model_name, top_k=5):
     model = SentenceTransformer(model_name)
     
     # Encode the query
-    query_embedding = model.encode([query])[0].reshape(1, -1)
+    query_embedding = model.encode([query], normalize_embeddings=True)
     
     # Search the index
     distances, indices = index.search(query_embedding, top_k)
@@ -122,7 +135,7 @@ def test_query(query, index, chunks, metadata, model_name, top_k=5):
             result = {
                 "chunk": chunks[idx],
                 "metadata": metadata[idx],
-                "distance": float(distances[0][i])
+                "similarity": float(distances[0][i])
             }
             results.append(result)
     
@@ -165,7 +178,7 @@ def main():
         print("\nTop 5 results:")
         for i, result in enumerate(results):
             print(f"\n--- Result {i+1} ---")
-            print(f"Distance: {result['distance']:.4f}")
+            print(f"Similarity: {result['similarity']:.4f}")
             print(f"Category: {result['metadata']['category']}")
             print(f"Source: {result['metadata']['file_name']}")
             print(f"Page: {result['metadata']['page_num']}")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Export the LOKI embedding model to an int8-quantized ONNX model.
+loki_search.py picks the exported model up automatically from
+<vector_db>/onnx/<model name> and uses ONNX Runtime instead of PyTorch
+for query encoding.
+
+Requires: pip install optimum[onnxruntime]
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+
+def export_model(model_name, output_dir, arch="avx512_vnni"):
+    """Export model_name to ONNX and dynamically quantize it to int8."""
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+    except ImportError:
+        print("Error: Missing required packages. Please install with:")
+        print("pip install optimum[onnxruntime]")
+        sys.exit(1)
+
+    model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    export_dir = tempfile.mkdtemp(prefix="loki_onnx_")
+
+    try:
+        # Export the FP32 model
+        print(f"Exporting {model_id} to ONNX")
+        model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+        model.save_pretrained(export_dir)
+
+        # Dynamic int8 quantization
+        print(f"Quantizing to int8 ({arch})")
+        qconfig = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(export_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+
+        # The encoder needs the tokenizer alongside the model
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(output_dir)
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    print(f"Quantized model saved to: {output_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to a quantized ONNX model")
+    parser.add_argument("--model", type=str, default="all-MiniLM-L6-v2", help="Embedding model to export")
+    parser.add_argument("--db-path", type=str, default="/home/mike/LOKI/vector_db",
+                        help="Path to the vector database directory")
+    parser.add_argument("--arch", type=str, default="avx512_vnni",
+                        choices=["avx512_vnni", "avx512", "avx2", "arm64"],
+                        help="Target instruction set for quantization")
+    args = parser.parse_args()
+
+    output_dir = os.path.join(args.db_path, "onnx", os.path.basename(args.model))
+    export_model(args.model, output_dir, args.arch)
+
+
+if __name__ == "__main__":
+    main()
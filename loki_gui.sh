@@ -28,19 +28,22 @@ display_banner() {
 check_requirements() {
     echo "Checking required Python packages..."
     
+    # Locate the packages with a single interpreter start, without importing them
+    MISSING=" $(python3 -c 'import importlib.util as iu; print(" ".join(m for m in ("tkinter", "customtkinter", "rich") if iu.find_spec(m) is None))') "
+    
     # Check for tk
-    if ! python3 -c "import tkinter" &>/dev/null; then
+    if [[ "${MISSING}" == *" tkinter "* ]]; then
         echo "Tkinter not found. Installing..."
         sudo dnf install -y python3-tkinter
     fi
     
     # Check for customtkinter and rich
-    if ! python3 -c "import customtkinter" &>/dev/null; then
+    if [[ "${MISSING}" == *" customtkinter "* ]]; then
         echo "CustomTkinter not found. Installing..."
         pip install customtkinter
     fi
     
-    if ! python3 -c "import rich" &>/dev/null; then
+    if [[ "${MISSING}" == *" rich "* ]]; then
         echo "Rich not found. Installing..."
         pip install rich
     fi
@@ -7,40 +7,245 @@ This script provides a command-line interface for searching the LOKI vector data
 import os
 import sys
 import json
+import mmap
+import hashlib
+import functools
+import importlib.util
 import pickle
 import argparse
 import time
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-import faiss
-from sentence_transformers import SentenceTransformer
+import numpy as np
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
-from rich import box
+
+# faiss, sentence_transformers and the rich renderables are imported where they are
+# used, so `--help` and argument errors do not pay for loading them
 
 # Initialize rich console for pretty output
 console = Console()
 
+
+@functools.lru_cache(maxsize=8)
+def _read_db_info(info_path, mtime_ns):
+    """Parse db_info.json; mtime_ns is part of the cache key so edits are picked up."""
+    with open(info_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def source_stamp(vector_db_path):
+    """Return a key identifying the chunks.pkl the derived stores were built from.
+    
+    migrate_vector_db.py records it in db_info.json for every store it writes, so a
+    store left over from before create_vector_db.py rebuilt the database can be told
+    apart and ignored. Returns None if chunks.pkl is gone.
+    """
+    try:
+        st = os.stat(os.path.join(vector_db_path, "chunks.pkl"))
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+class MmapRecords:
+    """Read-only sequence of variable-length records kept in one memory-mapped file.
+    
+    Record i is blob[offsets[i]:offsets[i + 1]], so only the pages of records that
+    are actually accessed are read from disk (see migrate_vector_db.py).
+    """
+    
+    def __init__(self, blob_path, offsets_path, decode=bytes.decode):
+        """Map the record blob and its uint64 offset table."""
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        self.decode = decode
+        with open(blob_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.blob = b""
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, i):
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.decode(self.blob[start:end])
+
+
+class ArrowRecords:
+    """Read-only sequence over columns of a memory-mapped Arrow IPC file.
+    
+    Given a single column name, items are that column's values; given several,
+    items are dicts of those columns. Only the requested columns are touched
+    (see migrate_vector_db.py --arrow).
+    """
+    
+    def __init__(self, path, columns):
+        """Memory-map the Arrow file at path and select the given column(s)."""
+        import pyarrow as pa
+        
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        if isinstance(columns, str):
+            self.column = table.column(columns).combine_chunks()
+            self.fields = None
+        else:
+            self.column = None
+            self.fields = {name: table.column(name).combine_chunks()
+                           for name in columns if name in table.column_names}
+        self.num_rows = table.num_rows
+    
+    def __len__(self):
+        return self.num_rows
+    
+    def __getitem__(self, i):
+        i = int(i)
+        if self.fields is None:
+            return self.column[i].as_py()
+        return {name: column[i].as_py() for name, column in self.fields.items()}
+
+
+class OnnxEncoder:
+    """Sentence embedding encoder backed by an exported ONNX Runtime model.
+    
+    Mirrors the subset of SentenceTransformer.encode used by LOKI (mean pooling
+    over token embeddings, optional L2 normalization) so it can be swapped in
+    when an exported model exists (see export_onnx_model.py).
+    """
+    
+    def __init__(self, model_dir, max_seq_length=256):
+        """Load the tokenizer and ONNX session from model_dir."""
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        model_file = os.path.join(model_dir, "model_quantized.onnx")
+        if not os.path.exists(model_file):
+            model_file = os.path.join(model_dir, "model.onnx")
+        
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(model_file, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+    
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, **kwargs):
+        """Encode a list of sentences into float32 embeddings."""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        
+        embeddings = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            inputs = self.tokenizer(batch, padding=True, truncation=True,
+                                    max_length=self.max_seq_length, return_tensors="np")
+            feed = {name: value.astype(np.int64) for name, value in inputs.items()
+                    if name in self.input_names}
+            token_embeddings = self.session.run(None, feed)[0]
+            
+            # Mean pooling over non-padding tokens
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings.append(pooled.astype(np.float32))
+        
+        return np.vstack(embeddings)
+
+
+class QueryBatcher:
+    """Background search worker that coalesces queries queued at the same time.
+    
+    Queries already waiting when the worker picks up a request (up to `max_batch`)
+    are answered by a single LokiSearch.search_batch call, i.e. one encoder
+    batch and one index search; each caller gets its own Future. The worker
+    never waits for more queries, so a lone query is searched immediately.
+    """
+    
+    def __init__(self, search_engine, max_batch=8):
+        """Start the worker thread for search_engine."""
+        self.search_engine = search_engine
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def submit(self, query, top_k=5):
+        """Queue a query and return a Future for its search results."""
+        future = Future()
+        self.requests.put((query, top_k, future))
+        return future
+    
+    def close(self):
+        """Stop the worker thread once queued queries are answered."""
+        self.requests.put(None)
+        self.thread.join()
+    
+    def _run(self):
+        """Drain the request queue in batches of whatever is already queued."""
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            
+            # Take the queries that are already waiting, without blocking for more
+            batch = [request]
+            while len(batch) < self.max_batch:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)  # Finish this batch, then stop
+                    break
+                batch.append(request)
+            
+            try:
+                top_k = max(k for _, k, _ in batch)
+                all_results = self.search_engine.search_batch([q for q, _, _ in batch], top_k=top_k)
+                for (_, k, future), search_results in zip(batch, all_results):
+                    search_results["results"] = search_results["results"][:k]
+                    search_results["total_results"] = len(search_results["results"])
+                    future.set_result(search_results)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
 class LokiSearch:
     """LOKI Search Engine for accessing the vector database."""
     
-    def __init__(self, vector_db_path="/home/mike/LOKI/vector_db", model_name=None):
+    # Metadata columns stored in chunks.arrow
+    METADATA_COLUMNS = ("chunk_id", "file_name", "file_path", "category", "page_num")
+    
+    # Number of query embeddings kept for repeated queries
+    QUERY_CACHE_SIZE = 256
+    
+    def __init__(self, vector_db_path="/home/mike/LOKI/vector_db", model_name=None, ef_search=64, nprobe=None):
         """Initialize the LOKI search engine."""
         self.vector_db_path = vector_db_path
+        self.ef_search = ef_search
+        self.nprobe = nprobe
         self.index = None
+        self.l2_metric = False
         self.chunks = None
         self.metadata = None
+        self.metadata_arrays = None
         self.model = None
         self.model_name = model_name
         self.db_info = None
+        self._query_cache = OrderedDict()
+        self._outdated_stores = set()
         
         # Load the database
         self.load_database()
     
     def load_database(self):
         """Load the vector database and associated files."""
+        import faiss
+        
         console.print("[bold blue]Loading LOKI Vector Database...[/bold blue]")
         
         try:
@@ -53,8 +258,7 @@ class LokiSearch:
             # Load the database info
             info_path = os.path.join(self.vector_db_path, "db_info.json")
             if os.path.exists(info_path):
-                with open(info_path, 'r', encoding='utf-8') as f:
-                    self.db_info = json.load(f)
+                self.db_info = _read_db_info(info_path, os.stat(info_path).st_mtime_ns)
                 
                 # Use the model from the database if not specified
                 if self.model_name is None:
@@ -62,35 +266,54 @@ class LokiSearch:
             else:
                 self.model_name = self.model_name or "all-MiniLM-L6-v2"
             
-            # Load the FAISS index
+            # Check the FAISS index exists before starting any background work
             index_path = os.path.join(self.vector_db_path, "faiss_index.bin")
             if not os.path.exists(index_path):
                 console.print(f"[bold red]Error: FAISS index not found at {index_path}[/bold red]")
                 sys.exit(1)
-            self.index = faiss.read_index(index_path)
             
-            # Load the chunks
-            chunks_path = os.path.join(self.vector_db_path, "chunks.pkl")
-            if not os.path.exists(chunks_path):
-                console.print(f"[bold red]Error: Chunks file not found at {chunks_path}[/bold red]")
-                sys.exit(1)
-            with open(chunks_path, 'rb') as f:
-                self.chunks = pickle.load(f)
-            
-            # Load the metadata
-            metadata_path = os.path.join(self.vector_db_path, "metadata.pkl")
-            if not os.path.exists(metadata_path):
-                console.print(f"[bold red]Error: Metadata file not found at {metadata_path}[/bold red]")
-                sys.exit(1)
-            with open(metadata_path, 'rb') as f:
-                self.metadata = pickle.load(f)
-            
-            # Load the embedding model
-            console.print(f"[yellow]Loading embedding model: {self.model_name}[/yellow]")
-            self.model = SentenceTransformer(self.model_name)
+            # The embedding model initialization is CPU-bound and independent of the
+            # disk-bound index and record loads, so run them concurrently
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                model_future = pool.submit(self._load_model)
+                chunks_future = pool.submit(self._load_chunks)
+                metadata_future = pool.submit(self._load_metadata)
+                
+                # Load the FAISS index, memory-mapped where the index type allows it
+                try:
+                    mmap_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+                    self.index = faiss.read_index(index_path, mmap_flags)
+                except RuntimeError:
+                    self.index = faiss.read_index(index_path)
+                self.l2_metric = self.index.metric_type == faiss.METRIC_L2
+                
+                # Graph indexes trade recall for speed via efSearch (see migrate_vector_db.py)
+                if isinstance(self.index, faiss.IndexHNSW):
+                    self.index.hnsw.efSearch = self.ef_search
+                
+                # IVF indexes trade recall for speed via nprobe (clusters scanned per query)
+                ivf_index = self._ivf_index()
+                if ivf_index is not None and self.nprobe:
+                    ivf_index.nprobe = self.nprobe
+                
+                # Let FAISS parallelize the scan over all cores. This lowers the latency of
+                # a single interactive query; when several searches run concurrently a
+                # smaller thread count gives better overall throughput.
+                faiss.omp_set_num_threads(os.cpu_count() or 1)
+                
+                self.chunks = chunks_future.result()
+                self.metadata = metadata_future.result()
+                self.metadata_arrays = self._load_metadata_arrays()
+                self.model = model_future.result()
             
             # Display database information
             console.print("[bold green]Vector database loaded successfully![/bold green]")
+            compression = self.index.d * 4 / self._bytes_per_vector()
+            index_details = f"{compression:.1f}x compression, {os.cpu_count() or 1} threads"
+            ivf_index = self._ivf_index()
+            if ivf_index is not None:
+                index_details += f", nprobe={ivf_index.nprobe}/{ivf_index.nlist}"
+            console.print(f"Index type: {type(self.index).__name__} ({index_details})")
             if self.db_info:
                 console.print(f"Creation date: {self.db_info.get('creation_date', 'Unknown')}")
                 console.print(f"Total chunks: {self.db_info.get('num_chunks', len(self.chunks))}")
@@ -102,55 +325,186 @@ class LokiSearch:
             console.print(f"[bold red]Error loading vector database: {str(e)}[/bold red]")
             sys.exit(1)
     
-    def search(self, query, top_k=5, min_score=0.0):
+    def _load_model(self):
+        """Load the embedding model, preferring an exported ONNX model if available."""
+        onnx_dir = os.path.join(self.vector_db_path, "onnx", os.path.basename(self.model_name))
+        if os.path.isdir(onnx_dir):
+            try:
+                console.print(f"[yellow]Loading ONNX embedding model: {onnx_dir}[/yellow]")
+                return OnnxEncoder(onnx_dir)
+            except ImportError:
+                console.print("[yellow]onnxruntime not available, falling back to PyTorch[/yellow]")
+        
+        from sentence_transformers import SentenceTransformer
+        console.print(f"[yellow]Loading embedding model: {self.model_name}[/yellow]")
+        return SentenceTransformer(self.model_name)
+    
+    def _arrow_store_path(self):
+        """Return the path of chunks.arrow if it is current and pyarrow is installed."""
+        arrow_path = os.path.join(self.vector_db_path, "chunks.arrow")
+        if (os.path.exists(arrow_path) and importlib.util.find_spec("pyarrow") is not None
+                and self._store_is_current("arrow_store")):
+            return arrow_path
+        return None
+    
+    def _load_chunks(self):
+        """Load the chunk texts from the fastest available store."""
+        arrow_path = self._arrow_store_path()
+        if arrow_path:
+            return ArrowRecords(arrow_path, "chunk_text")
+        return self._load_records("chunks", bytes.decode)
+    
+    def _load_metadata(self):
+        """Load the chunk metadata from the fastest available store."""
+        arrow_path = self._arrow_store_path()
+        if arrow_path:
+            return ArrowRecords(arrow_path, self.METADATA_COLUMNS)
+        return self._load_records("metadata", json.loads)
+    
+    def _load_metadata_arrays(self):
+        """Memory-map the category, file name and page number arrays, if present and current."""
+        names = ("categories", "file_names", "page_nums")
+        paths = [os.path.join(self.vector_db_path, f"{name}.npy") for name in names]
+        if not all(os.path.exists(path) for path in paths) or not self._store_is_current("metadata_arrays"):
+            return None
+        return tuple(np.load(path, mmap_mode='r') for path in paths)
+    
+    def _store_is_current(self, store):
+        """Return True if the derived store was built from the current chunks.pkl."""
+        stamp = source_stamp(self.vector_db_path)
+        if stamp is None or (self.db_info or {}).get(f"{store}_source") == stamp:
+            return True
+        if store not in self._outdated_stores:
+            self._outdated_stores.add(store)
+            console.print(f"[yellow]Ignoring outdated {store.replace('_', ' ')}, "
+                          f"rerun migrate_vector_db.py to update it[/yellow]")
+        return False
+    
+    def _load_records(self, name, decode):
+        """Open <name>.bin as memory-mapped records, falling back to <name>.pkl."""
+        blob_path = os.path.join(self.vector_db_path, f"{name}.bin")
+        offsets_path = os.path.join(self.vector_db_path, f"{name}_offsets.npy")
+        if (os.path.exists(blob_path) and os.path.exists(offsets_path)
+                and self._store_is_current("chunk_store")):
+            return MmapRecords(blob_path, offsets_path, decode)
+        
+        pickle_path = os.path.join(self.vector_db_path, f"{name}.pkl")
+        if not os.path.exists(pickle_path):
+            console.print(f"[bold red]Error: {name.capitalize()} file not found at {pickle_path}[/bold red]")
+            sys.exit(1)
+        with open(pickle_path, 'rb') as f:
+            return pickle.load(f)
+    
+    def _ivf_index(self):
+        """Return the IVF part of the index, or None for non-IVF indexes."""
+        import faiss
+        
+        try:
+            return faiss.extract_index_ivf(self.index)
+        except RuntimeError:
+            return None
+    
+    def _bytes_per_vector(self):
+        """Return the number of bytes the index stores per vector."""
+        import faiss
+        
+        index = self.index
+        if isinstance(index, faiss.IndexHNSW):
+            index = faiss.downcast_index(index.storage)
+        return getattr(index, "code_size", index.d * 4)
+    
+    def search(self, query, top_k=5, min_score=None):
         """Search the vector database for the given query."""
+        return self.search_batch([query], top_k=top_k, min_score=min_score)[0]
+    
+    def search_batch(self, queries, top_k=5, min_score=None):
+        """Search the vector database for several queries with a single encode and index search."""
         try:
             start_time = time.time()
             
-            # Encode the query
-            query_embedding = self.model.encode([query])[0].reshape(1, -1)
+            # Encode all queries at once (normalized, so inner product = cosine similarity)
+            query_embeddings = self._encode_queries(queries)
+            # FAISS copies anything that is not C-contiguous float32, so convert only when needed
+            # (quantized indexes still take float32 queries)
+            query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
             
             # Search the index
-            distances, indices = self.index.search(query_embedding, top_k)
-            
-            # Process results
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx >= 0 and idx < len(self.chunks):
-                    # Calculate similarity score (convert distance to similarity)
-                    # FAISS uses L2 distance, so we need to convert to similarity score
-                    # Lower distance = higher similarity
-                    distance = float(distances[0][i])
-                    similarity = 1.0 / (1.0 + distance)
-                    
-                    # Skip results below minimum score
-                    if similarity < min_score:
-                        continue
-                    
-                    result = {
-                        "chunk": self.chunks[idx],
-                        "metadata": self.metadata[idx],
-                        "distance": distance,
-                        "similarity": similarity
-                    }
-                    results.append(result)
+            distances, indices = self.index.search(query_embeddings, top_k)
+            if self.l2_metric:
+                # Older databases use an L2 index over normalized embeddings, where the
+                # squared distance is 2 - 2 * cosine similarity
+                distances = 1.0 - distances / 2.0
             
             # Calculate search time
             search_time = time.time() - start_time
             
-            return {
-                "results": results,
-                "query": query,
-                "search_time": search_time,
-                "total_results": len(results)
-            }
+            return [self._collect_results(query, distances[row], indices[row], min_score, search_time)
+                    for row, query in enumerate(queries)]
         
         except Exception as e:
             console.print(f"[bold red]Error during search: {str(e)}[/bold red]")
-            return {"results": [], "query": query, "error": str(e)}
+            return [{"results": [], "query": query, "error": str(e)} for query in queries]
+    
+    def _encode_queries(self, queries):
+        """Encode queries, reusing cached embeddings of previously seen queries.
+        
+        The cache is keyed by the SHA-256 of the lower-cased, whitespace-collapsed
+        query, so resubmitted queries skip the encoder forward pass entirely.
+        """
+        keys = [hashlib.sha256(" ".join(query.lower().split()).encode('utf-8')).hexdigest()
+                for query in queries]
+        
+        embeddings = {}
+        missing = {}
+        for key, query in zip(keys, queries):
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                embeddings[key] = self._query_cache[key]
+            else:
+                missing.setdefault(key, query)
+        
+        if missing:
+            new_embeddings = self.model.encode(list(missing.values()), batch_size=32,
+                                               normalize_embeddings=True, convert_to_numpy=True)
+            for key, embedding in zip(missing, new_embeddings):
+                embeddings[key] = embedding
+                self._query_cache[key] = embedding
+            while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        
+        return np.vstack([embeddings[key] for key in keys])
+    
+    def _collect_results(self, query, distances, indices, min_score, search_time):
+        """Build the result dictionary for one query from its row of FAISS output."""
+        # Mask out missing hits (-1) and, if a threshold is given, scores below it
+        # (cosine similarities can be negative, so there is no neutral default)
+        valid = (indices >= 0) & (indices < len(self.chunks))
+        if min_score is not None:
+            valid &= distances >= min_score
+        results = [
+            {
+                "chunk": self.chunks[idx],
+                "metadata": self.metadata[idx],
+                "similarity": similarity,
+                "index": idx
+            }
+            for idx, similarity in zip(indices[valid].tolist(), distances[valid].tolist())
+        ]
+        
+        return {
+            "results": results,
+            "query": query,
+            "search_time": search_time,
+            "total_results": len(results)
+        }
     
     def display_results(self, search_results):
         """Display the search results in a nicely formatted way."""
+        from rich import box
+        from rich.console import Group
+        from rich.panel import Panel
+        from rich.table import Table
+        
         query = search_results["query"]
         results = search_results["results"]
         search_time = search_results.get("search_time", 0)
@@ -177,37 +531,54 @@ class LokiSearch:
             console.print("[bold red]No results found.[/bold red]")
             return
         
+        # Build every result panel first and render them in a single print
+        renderables = []
         for i, result in enumerate(results):
             # Extract information
             chunk_text = result["chunk"]
             similarity = result.get("similarity", 0) * 100  # Convert to percentage
-            metadata = result["metadata"]
-            category = metadata.get("category", "Unknown").replace("library-", "")
-            file_name = metadata.get("file_name", "Unknown")
-            page_num = metadata.get("page_num", 0)
-            
-            # Format the text
-            if len(chunk_text) > 500:
-                display_text = chunk_text[:500] + "..."
+            if self.metadata_arrays is not None and "index" in result:
+                # Precomputed by migrate_vector_db.py --metadata-arrays
+                categories, file_names, page_nums = self.metadata_arrays
+                idx = result["index"]
+                category, file_name, page_num = categories[idx], file_names[idx], page_nums[idx]
             else:
-                display_text = chunk_text
+                metadata = result["metadata"]
+                category = metadata.get("category", "Unknown").replace("library-", "")
+                file_name = metadata.get("file_name", "Unknown")
+                page_num = metadata.get("page_num", 0)
+            
+            # Format the text (short chunks are shown as-is, without copying)
+            display_text = f"{chunk_text[:500]}..." if len(chunk_text) > 500 else chunk_text
             
             # Create result panel
             result_title = f"Result #{i+1} - {similarity:.1f}% Match"
-            result_panel = Panel(
+            renderables.append(Panel(
                 display_text,
                 title=result_title,
                 subtitle=f"Category: {category} | File: {file_name} | Page: {page_num}",
                 border_style="green" if similarity > 70 else "yellow" if similarity > 50 else "red"
-            )
-            console.print(result_panel)
-            console.print()
+            ))
+            renderables.append("")
+        
+        console.print(Group(*renderables))
     
     def interactive_search(self):
         """Run an interactive search session."""
+        from rich.panel import Panel
+        
         console.print(Panel("[bold blue]LOKI Interactive Search[/bold blue]", 
                           subtitle="Type 'exit' to quit, 'help' for assistance"))
         
+        # Searches run on a worker thread that batches back-to-back queries
+        batcher = QueryBatcher(self)
+        try:
+            self._interactive_loop(batcher)
+        finally:
+            batcher.close()
+    
+    def _interactive_loop(self, batcher):
+        """Prompt for queries until the user exits."""
         while True:
             # Get query from user
             query = console.input("[bold green]Enter your search query:[/bold green] ")
@@ -229,13 +600,15 @@ class LokiSearch:
                 continue
             
             # Perform search
-            search_results = self.search(query, top_k=5)
+            search_results = batcher.submit(query, top_k=5).result()
             
             # Display results
             self.display_results(search_results)
     
     def display_help(self):
         """Display help information."""
+        from rich.markdown import Markdown
+        
         help_text = """
 # LOKI Search Help
 
@@ -268,8 +641,15 @@ def main():
                         help="Search query (if not provided, runs in interactive mode)")
     parser.add_argument("--top-k", type=int, default=5,
                         help="Number of results to return")
+    parser.add_argument("--nprobe", type=int, default=None,
+                        help="Clusters to scan per query for IVF indexes (higher = better recall, slower)")
+    parser.add_argument("--ef-search", type=int, default=64,
+                        help="Search depth for HNSW indexes (higher = better recall, slower)")
     args = parser.parse_args()
     
+    from rich.panel import Panel
+    from rich.text import Text
+    
     # Create banner
     console.print()
     console.print(Panel.fit(
@@ -280,7 +660,8 @@ def main():
     console.print()
     
     # Initialize the search engine
-    loki_search = LokiSearch(vector_db_path=args.db_path, model_name=args.model)
+    loki_search = LokiSearch(vector_db_path=args.db_path, model_name=args.model,
+                             ef_search=args.ef_search, nprobe=args.nprobe)
     
     # Run search
     if args.query:
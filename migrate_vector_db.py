@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+LOKI Vector Database Migration - Convert an existing vector database to faster formats
+without re-running the full database creation.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import pickle
+import argparse
+import numpy as np
+import faiss
+
+from loki_search import source_stamp
+
+
+def load_vectors(vector_db_path):
+    """Read the stored embeddings back out of the flat index as normalized float32 vectors."""
+    index_path = os.path.join(vector_db_path, "faiss_index.bin")
+    if not os.path.exists(index_path):
+        print(f"Error: FAISS index not found at {index_path}")
+        sys.exit(1)
+    index = faiss.read_index(index_path)
+
+    # Once migrated, the exact vectors are only in the flat backup
+    if not isinstance(index, faiss.IndexFlat):
+        index_path = os.path.join(vector_db_path, "faiss_index.flat.bin")
+        if not os.path.exists(index_path):
+            print(f"Error: No flat index to read vectors from in {vector_db_path}")
+            sys.exit(1)
+        index = faiss.read_index(index_path)
+
+    print(f"Reading {index.ntotal} vectors from {os.path.basename(index_path)}")
+    vectors = index.reconstruct_n(0, index.ntotal)
+    faiss.normalize_L2(vectors)
+    return vectors, index_path
+
+
+def build_hnsw_index(vectors, m=32, ef_construction=200, ef_search=64):
+    """Build a graph-based HNSW index (sub-linear search, no training needed)."""
+    index = faiss.IndexHNSWFlat(vectors.shape[1], m, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = ef_construction
+    index.hnsw.efSearch = ef_search
+    index.add(vectors)
+    return index
+
+
+def build_ivfpq_index(vectors, nlist=4096, m=16, nbits=8, nprobe=16, max_train=100000):
+    """Build a clustered, product-quantized IVF-PQ index for very large corpora."""
+    num_vectors, dim = vectors.shape
+
+    # IVF needs several training points per list; shrink nlist for small corpora
+    nlist = max(1, min(nlist, num_vectors // 39, int(4 * math.sqrt(num_vectors))))
+
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+
+    # Train on a random subset
+    rng = np.random.default_rng(0)
+    train_ids = rng.choice(num_vectors, size=min(num_vectors, max_train), replace=False)
+    print(f"Training IVF-PQ (nlist={nlist}, m={m}) on {len(train_ids)} vectors")
+    index.train(vectors[train_ids])
+    index.add(vectors)
+    index.nprobe = min(nprobe, nlist)
+    return index
+
+
+def build_sq_index(vectors, quantizer_type=faiss.ScalarQuantizer.QT_fp16):
+    """Build a flat index storing scalar-quantized (fp16 or int8) vectors."""
+    index = faiss.IndexScalarQuantizer(vectors.shape[1], quantizer_type, faiss.METRIC_INNER_PRODUCT)
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def rebuild_index(vector_db_path, index_type="hnsw"):
+    """Rebuild faiss_index.bin as an HNSW, IVF-PQ or scalar-quantized index, keeping a flat backup."""
+    vectors, source_path = load_vectors(vector_db_path)
+
+    start_time = time.time()
+    print(f"Building {index_type} index")
+    if index_type == "hnsw":
+        index = build_hnsw_index(vectors)
+    elif index_type == "ivfpq":
+        index = build_ivfpq_index(vectors)
+    elif index_type == "fp16":
+        index = build_sq_index(vectors, faiss.ScalarQuantizer.QT_fp16)
+    elif index_type == "sq8":
+        index = build_sq_index(vectors, faiss.ScalarQuantizer.QT_8bit)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    print(f"Index built in {time.time() - start_time:.2f} seconds")
+
+    # Keep the flat index so later migrations can read exact vectors again
+    # (replacing any backup left over from before the database was recreated)
+    index_path = os.path.join(vector_db_path, "faiss_index.bin")
+    backup_path = os.path.join(vector_db_path, "faiss_index.flat.bin")
+    if source_path == index_path:
+        os.replace(index_path, backup_path)
+        print(f"Flat index kept as: {backup_path}")
+
+    faiss.write_index(index, index_path)
+    update_db_info(vector_db_path, index_type=index_type, metric="cosine")
+    print(f"Index saved to: {index_path}")
+
+
+def write_records(records, blob_path, offsets_path, encode):
+    """Write records into one blob plus a uint64 offset table (read by loki_search.MmapRecords)."""
+    offsets = np.zeros(len(records) + 1, dtype=np.uint64)
+    position = 0
+    with open(blob_path, 'wb') as f:
+        for i, record in enumerate(records):
+            data = encode(record)
+            f.write(data)
+            position += len(data)
+            offsets[i + 1] = position
+    np.save(offsets_path, offsets)
+
+
+def convert_chunk_store(vector_db_path):
+    """Convert chunks.pkl and metadata.pkl into memory-mappable record files."""
+    encoders = {
+        "chunks": lambda text: text.encode('utf-8'),
+        "metadata": lambda meta: json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    }
+
+    for name, encode in encoders.items():
+        records = load_pickle(vector_db_path, name)
+
+        blob_path = os.path.join(vector_db_path, f"{name}.bin")
+        write_records(records, blob_path, os.path.join(vector_db_path, f"{name}_offsets.npy"), encode)
+        print(f"Wrote {len(records)} {name} records to: {blob_path}")
+    
+    update_db_info(vector_db_path, chunk_store_source=source_stamp(vector_db_path))
+
+
+def load_pickle(vector_db_path, name):
+    """Load chunks.pkl or metadata.pkl from the vector database."""
+    pickle_path = os.path.join(vector_db_path, f"{name}.pkl")
+    if not os.path.exists(pickle_path):
+        print(f"Error: {name.capitalize()} file not found at {pickle_path}")
+        sys.exit(1)
+    with open(pickle_path, 'rb') as f:
+        return pickle.load(f)
+
+
+def convert_arrow_store(vector_db_path):
+    """Write chunk text and metadata as columns of one Arrow IPC file (chunks.arrow)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("Error: pyarrow is required for --arrow. Please install with:")
+        print("pip install pyarrow")
+        sys.exit(1)
+
+    chunks = load_pickle(vector_db_path, "chunks")
+    metadata = load_pickle(vector_db_path, "metadata")
+
+    table = pa.table({
+        "chunk_text": pa.array(chunks, type=pa.string()),
+        "chunk_id": pa.array([str(m.get('chunk_id', 'unknown')) for m in metadata], type=pa.string()),
+        "file_name": pa.array([m.get('file_name', 'Unknown') for m in metadata], type=pa.string()),
+        "file_path": pa.array([m.get('file_path', '') for m in metadata], type=pa.string()),
+        "category": pa.array([m.get('category', 'Unknown') for m in metadata], type=pa.string()),
+        "page_num": pa.array([int(m.get('page_num', 0)) for m in metadata], type=pa.int32())
+    })
+
+    arrow_path = os.path.join(vector_db_path, "chunks.arrow")
+    with pa.OSFile(arrow_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    print(f"Wrote {table.num_rows} rows to: {arrow_path}")
+    update_db_info(vector_db_path, arrow_store_source=source_stamp(vector_db_path))
+
+
+def convert_metadata_arrays(vector_db_path):
+    """Write the displayed metadata fields as parallel NumPy arrays (categories, file names, pages)."""
+    metadata = load_pickle(vector_db_path, "metadata")
+
+    # Fixed-width unicode arrays can be memory-mapped, unlike object arrays
+    arrays = {
+        "categories": np.array([m.get('category', 'Unknown').replace("library-", "") for m in metadata], dtype=np.str_),
+        "file_names": np.array([m.get('file_name', 'Unknown') for m in metadata], dtype=np.str_),
+        "page_nums": np.array([int(m.get('page_num', 0)) for m in metadata], dtype=np.int32)
+    }
+
+    for name, array in arrays.items():
+        np.save(os.path.join(vector_db_path, f"{name}.npy"), array)
+    update_db_info(vector_db_path, metadata_arrays_source=source_stamp(vector_db_path))
+    print(f"Wrote metadata arrays for {len(metadata)} chunks to: {vector_db_path}")
+
+
+def update_db_info(vector_db_path, **fields):
+    """Record migration details in db_info.json."""
+    info_path = os.path.join(vector_db_path, "db_info.json")
+    info = {}
+    if os.path.exists(info_path):
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+
+    info.update(fields)
+
+    # Write the whole file once and swap it in, so readers never see a partial file
+    tmp_path = f"{info_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, info_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the LOKI vector database to faster formats")
+    parser.add_argument("--db-path", type=str, default="/home/mike/LOKI/vector_db",
+                        help="Path to the vector database directory")
+    parser.add_argument("--index", type=str, choices=["hnsw", "ivfpq", "fp16", "sq8"],
+                        help="Rebuild the FAISS index with the given type")
+    parser.add_argument("--chunk-store", action="store_true",
+                        help="Convert chunks.pkl and metadata.pkl to memory-mapped record files")
+    parser.add_argument("--arrow", action="store_true",
+                        help="Convert chunks.pkl and metadata.pkl to a columnar Arrow file (requires pyarrow)")
+    parser.add_argument("--metadata-arrays", action="store_true",
+                        help="Write category, file name and page number arrays used for displaying results")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"Error: Vector database not found at {args.db_path}")
+        sys.exit(1)
+
+    if not (args.index or args.chunk_store or args.arrow or args.metadata_arrays):
+        parser.print_help()
+        return
+
+    if args.index:
+        rebuild_index(args.db_path, args.index)
+    if args.chunk_store:
+        convert_chunk_store(args.db_path)
+    if args.arrow:
+        convert_arrow_store(args.db_path)
+    if args.metadata_arrays:
+        convert_metadata_arrays(args.db_path)
+
+
+if __name__ == "__main__":
+    main()
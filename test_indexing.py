@@ -6,13 +6,46 @@ LOKI Indexing Test Script - Check if indexed data exists and is valid
 import os
 import sys
 import json
-import glob
+import random
 from datetime import datetime
 
+# orjson parses large indexed files several times faster; fall back to the stdlib parser
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Define paths
 indexed_data_dir = "/home/mike/LOKI/indexed_data"
 database_dir = "/home/mike/LOKI/DATABASE/survivorlibrary"
 
+
+def iter_files(root, suffix):
+    """Yield files under root whose names end with suffix, using an os.scandir stack (no per-file stat)."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(suffix):
+                    yield entry.path
+
+
+def load_json(path):
+    """Parse a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 # Print header
 print("=" * 60)
 print(f"LOKI Indexing Test Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -25,29 +58,30 @@ if not os.path.exists(indexed_data_dir):
     print("Please run the indexing script first.")
     sys.exit(1)
 
-# Count JSON files in the indexed data directory
-json_files = glob.glob(os.path.join(indexed_data_dir, "**", "*.json"), recursive=True)
-print(f"Found {len(json_files)} indexed files")
+# Count JSON files in the indexed data directory, picking a random one to examine
+# (reservoir sampling, so the file list is never held in memory)
+json_count = 0
+sample_file = None
+for json_file in iter_files(indexed_data_dir, ".json"):
+    json_count += 1
+    if random.randrange(json_count) == 0:
+        sample_file = json_file
+print(f"Found {json_count} indexed files")
 
 # Count PDF files in the database
-pdf_files = []
-for root, dirs, files in os.walk(database_dir):
-    for file in files:
-        if file.lower().endswith('.pdf'):
-            pdf_files.append(os.path.join(root, file))
+pdf_count = sum(1 for _ in iter_files(database_dir, ".pdf"))
 
-print(f"Total PDFs in database: {len(pdf_files)}")
+print(f"Total PDFs in database: {pdf_count}")
 
-if len(pdf_files) > 0:
-    percentage = (len(json_files) / len(pdf_files)) * 100
+if pdf_count > 0:
+    percentage = (json_count / pdf_count) * 100
     print(f"Indexing progress: {percentage:.2f}%")
 
 # Check summary file
 summary_file = os.path.join(indexed_data_dir, "indexing_summary.json")
 if os.path.exists(summary_file):
     try:
-        with open(summary_file, 'r', encoding='utf-8') as f:
-            summary = json.load(f)
+        summary = load_json(summary_file)
         
         print("\nSummary Information:")
         print(f"- Start time: {summary.get('start_time', 'Unknown')}")
@@ -62,15 +96,12 @@ else:
     print("\nNo indexing summary file found.")
 
 # Examine a random indexed file for content
-if json_files:
+if sample_file:
     print("\nExamining a random indexed file...")
-    import random
-    sample_file = random.choice(json_files)
     print(f"Selected file: {os.path.basename(sample_file)}")
     
     try:
-        with open(sample_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json(sample_file)
         
         # Show metadata
         if "metadata" in data: